@@ -3,19 +3,33 @@ import pandas as pd
 import mysql.connector
 import os
 from datetime import datetime, timedelta
-from mysql.connector import Error
+from mysql.connector import Error, PoolError
+from mysql.connector.pooling import MySQLConnectionPool
 import importlib
-import sys
+import fois_data_mysql
 
-# Helper to get MySQL connection from environment variables
-def get_mysql_connection():
-    return mysql.connector.connect(
+def get_mysql_settings():
+    return dict(
         host=os.getenv('MYSQL_HOST'),
         user=os.getenv('MYSQL_USER'),
         password=os.getenv('MYSQL_PASSWORD'),
-        database=os.getenv('MYSQL_DATABASE')
+        database=os.getenv('MYSQL_DATABASE'),
+        autocommit=False
     )
 
+# Connection pool shared across Streamlit reruns and sessions
+@st.cache_resource
+def get_mysql_pool():
+    return MySQLConnectionPool(pool_name="fois_dashboard", pool_size=4, **get_mysql_settings())
+
+# Helper to get a pooled MySQL connection; close() returns it to the pool.
+# The pool does not wait when every connection is busy, so open a direct one instead
+def get_mysql_connection():
+    try:
+        return get_mysql_pool().get_connection()
+    except PoolError:
+        return mysql.connector.connect(**get_mysql_settings())
+
 def get_table_names(connection):
     cursor = connection.cursor()
     cursor.execute("SHOW TABLES")
@@ -34,18 +48,50 @@ def get_max_tdate_and_count(connection, table_name):
     finally:
         cursor.close()
 
+def get_all_max_tdate_and_count(connection, tables):
+    if not tables:
+        return {}
+    cursor = connection.cursor()
+    try:
+        sql = " UNION ALL ".join(
+            f"SELECT %s AS t, MAX(TDATE), COUNT(*) FROM `{table}`" for table in tables
+        )
+        cursor.execute(sql, tuple(tables))
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    except Exception:
+        # One table without TDATE fails the whole batch, so fall back to per-table queries
+        return {table: get_max_tdate_and_count(connection, table) for table in tables}
+    finally:
+        cursor.close()
+
+# Table list and per-table stats, cached briefly so widget reruns skip the database
+@st.cache_data(ttl=60)
+def get_df_tables():
+    conn = get_mysql_connection()
+    try:
+        return [t for t in get_table_names(conn) if t.startswith('df_')]
+    finally:
+        conn.close()
+
+@st.cache_data(ttl=60)
+def get_all_table_stats(tables: tuple) -> dict:
+    conn = get_mysql_connection()
+    try:
+        return get_all_max_tdate_and_count(conn, tables)
+    finally:
+        conn.close()
+
 def run_table_script(table_name):
-    # Import and call run_for_table from fois_data_mysql.py
+    # Call run_for_table from fois_data_mysql.py; only reload it for local development
     try:
-        if 'fois_data_mysql' in sys.modules:
-            importlib.reload(sys.modules['fois_data_mysql'])
-            fois_data_mysql = sys.modules['fois_data_mysql']
-        else:
-            fois_data_mysql = importlib.import_module('fois_data_mysql')
+        if os.getenv('DEV'):
+            importlib.reload(fois_data_mysql)
         # Accept both 'df_xxx' and 'xxx' as table_name
         key = table_name[3:] if table_name.startswith('df_') else table_name
         result = fois_data_mysql.run_for_table(key)
         if result:
+            # New rows were loaded, so drop the cached stats
+            get_all_table_stats.clear()
             st.success(f"Script ran successfully for {table_name}")
         else:
             st.error(f"Script failed for {table_name}")
@@ -79,13 +125,12 @@ st.title("FOIS Data Table Status Dashboard")
 
 with st.spinner("Connecting to database..."):
     try:
-        conn = get_mysql_connection()
-        tables = get_table_names(conn)
+        df_tables = get_df_tables()
+        table_stats = get_all_table_stats(tuple(df_tables))
     except Exception as e:
         st.error(f"Database connection failed: {e}")
         st.stop()
 
-df_tables = [t for t in tables if t.startswith('df_')]
 # Responsive: 3 columns on wide screens, 1 on mobile
 cols_per_row = 3 if len(df_tables) > 1 else 1
 rows = [df_tables[i:i+cols_per_row] for i in range(0, len(df_tables), cols_per_row)]
@@ -95,7 +140,7 @@ for row in rows:
     cols = st.columns(len(row))
     for idx, table in enumerate(row):
         with cols[idx]:
-            max_tdate, row_count = get_max_tdate_and_count(conn, table)
+            max_tdate, row_count = table_stats[table]
             is_green = max_tdate and str(max_tdate) == str(yesterday)
             card_color = "" if is_green else " red"
             # Start card div
@@ -112,5 +157,3 @@ for row in rows:
             if st.button(f"Run Script for {table.upper()}", key=f"run_{table}"):
                 run_table_script(table)
 
-if conn:
-    conn.close()
@@ -1,15 +1,25 @@
 import requests
 import json
+import orjson
+import ijson
 import os
 import base64
 import argparse
 import sys
 import time
+import random
+import re
+import tempfile
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import pandas as pd
+from requests.adapters import HTTPAdapter
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from google.oauth2.service_account import Credentials
 from gspread.exceptions import APIError, WorksheetNotFound
 
 # ---------------------- FOIS API Client ----------------------
@@ -27,6 +37,56 @@ class FOISAPIClient:
         self.revoke_url = "https://gw.crisapis.indianrail.gov.in/revoke"
         self.access_token = None
         self.token_expires_at = None
+        self.token_lock = threading.Lock()
+        # Reuse one keep-alive session for all calls to the CRIS gateway
+        self.session = requests.Session()
+        self.session.headers.update({"accept": "*/*"})
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        self.token_cache_file = os.path.expanduser(os.getenv('FOIS_TOKEN_CACHE', '~/.fois_token.json'))
+        self.load_cached_token()
+
+    def load_cached_token(self):
+        """
+        Load a previously cached access token if it is still valid for at least another minute.
+        """
+        try:
+            with open(self.token_cache_file) as f:
+                cached = json.load(f)
+            expires_at = datetime.fromisoformat(cached['expires_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if expires_at > datetime.now() + timedelta(seconds=60):
+            self.access_token = cached['access_token']
+            self.token_expires_at = expires_at
+            print(f"✓ Using cached access token (valid until {expires_at:%H:%M:%S})")
+
+    def save_cached_token(self):
+        """
+        Atomically write the current access token and its expiry to the token cache file.
+        """
+        tmp_file = None
+        try:
+            # A temp file of our own (mkstemp creates it with mode 0600), so scripts running at the
+            # same time never write into each other's file before the rename
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.token_cache_file) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"access_token": self.access_token, "expires_at": self.token_expires_at.isoformat()}, f)
+            os.replace(tmp_file, self.token_cache_file)
+        except OSError as e:
+            print(f"Warning: could not cache access token: {e}")
+            if tmp_file is not None and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def clear_cached_token(self):
+        """
+        Remove the token cache file, if any.
+        """
+        try:
+            os.remove(self.token_cache_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: could not remove cached access token: {e}")
 
     def get_access_token(self):
         """
@@ -41,15 +101,17 @@ class FOISAPIClient:
         data = {"grant_type": "client_credentials"}
         try:
             print("Requesting access token...")
-            response = requests.post(self.token_url, headers=headers, data=data)
+            response = self.session.post(self.token_url, headers=headers, data=data)
             response.raise_for_status()
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             self.access_token = token_data.get('access_token')
             expires_in = token_data.get('expires_in', 3600)
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+            # Treat the token as expired a little early so it never lapses mid-request
+            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - max(60, 0.05 * expires_in))
             print(f"✓ Access token obtained successfully (expires in {expires_in} seconds)")
+            self.save_cached_token()
             return self.access_token
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"Error getting access token: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 print(f"Status code: {e.response.status_code}")
@@ -67,10 +129,20 @@ class FOISAPIClient:
     def ensure_valid_token(self):
         """
         Ensure a valid access token is available.
+        Guarded by a lock so concurrent endpoint fetches refresh the token only once.
+        """
+        with self.token_lock:
+            if not self.is_token_valid():
+                self.get_access_token()
+            return self.access_token
+
+    def force_refresh_token(self):
+        """
+        Discard the current access token and obtain a new one.
         """
-        if not self.is_token_valid():
+        with self.token_lock:
             self.get_access_token()
-        return self.access_token
+            return self.access_token
 
     def revoke_token(self):
         """
@@ -88,10 +160,11 @@ class FOISAPIClient:
         data = {"token": self.access_token}
         try:
             print("Revoking access token...")
-            response = requests.post(self.revoke_url, headers=headers, data=data)
+            response = self.session.post(self.revoke_url, headers=headers, data=data)
             response.raise_for_status()
             self.access_token = None
             self.token_expires_at = None
+            self.clear_cached_token()
             print("✓ Token revoked successfully")
         except requests.exceptions.RequestException as e:
             print(f"Error revoking token: {e}")
@@ -100,6 +173,11 @@ class FOISAPIClient:
                 print(f"Response: {e.response.text}")
 
 # ---------------------- Google Sheets Helpers ----------------------
+# gspread objects are shared by the endpoint workers, so Sheets calls are made one at a time
+_GSHEET_LOCK = threading.Lock()
+# TDATE values known to be in each tab, read once per run and kept current by push_df_to_gsheet
+_tdate_cache = {}
+
 def get_gspread_client():
     """
     Authenticate and return a gspread client using service account credentials.
@@ -110,7 +188,7 @@ def get_gspread_client():
         "https://www.googleapis.com/auth/drive.file",
         "https://www.googleapis.com/auth/drive"
     ]
-    creds = ServiceAccountCredentials.from_json_keyfile_name("gs_credentials.json", scope)
+    creds = Credentials.from_service_account_file("gs_credentials.json", scopes=scope)
     return gspread.authorize(creds)
 
 def get_spreadsheet(gclient):
@@ -126,178 +204,243 @@ def get_spreadsheet(gclient):
     print(f"Connected to Google Sheet: {spreadsheet_name or spreadsheet.title}")
     return spreadsheet
 
-def push_df_to_gsheet(df, df_var_name, spreadsheet, retries=3, delay=5):
+# Sheets write quotas refill per minute, so rate-limit retries back off on that scale
+RATE_LIMIT_BASE_DELAY = 30
+
+def get_retry_delay(error, attempt, base_delay):
+    """
+    Return the seconds to wait before retrying a Google Sheets APIError, or None if it is not retryable.
+    Rate limits (429) honour Retry-After, else wait out the quota window; server errors back off
+    exponentially with jitter.
+    """
+    status = getattr(error.response, 'status_code', None)
+    if status == 429:
+        retry_after = error.response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return int(retry_after)
+        return min(60, RATE_LIMIT_BASE_DELAY * 2 ** attempt) + random.uniform(0, 5)
+    if status not in (500, 502, 503, 504):
+        return None
+    return min(30, base_delay * 2 ** attempt) + random.uniform(0, 0.5)
+
+def remember_pushed_tdates(df, df_var_name):
+    """
+    Add the TDATEs just written to df_var_name to the cache, if that tab has been read this run.
+    """
+    if df_var_name in _tdate_cache and "TDATE" in df.columns:
+        _tdate_cache[df_var_name].update(df["TDATE"])
+
+def push_df_to_gsheet(df, df_var_name, spreadsheet, retries=3, base_delay=0.5):
     """
     Push a DataFrame to a Google Sheet tab named as df_var_name with retries.
-    If the sheet does not exist, create it. If it exists, append data.
+    Rows go out in a single values.append call; if the tab does not exist, it is created and the
+    header is written with the rows.
+    Each step runs once it has succeeded, so a retry never appends the rows a second time.
+    Raises the last APIError if the write still fails after all retries.
     """
-    df = df.astype(str)
     headers = df.columns.tolist()
-    rows = df.values.tolist()
-    for attempt in range(retries):
+    # Stringify cell by cell from the tuple iterator instead of building a second, all-str DataFrame
+    rows = [[str(v) for v in row] for row in df.fillna('').itertuples(index=False, name=None)]
+    values = rows
+    create_tab = False
+    tab_created = False
+    appended = False
+    header_missing = False
+    attempt = 0
+    while True:
         try:
-            worksheet = spreadsheet.worksheet(df_var_name)
-            existing_rows = len(worksheet.get_all_values())
-            if existing_rows == 0:
-                worksheet.append_row(headers)
-            if rows:
-                worksheet.append_rows(rows)
+            if create_tab:
+                spreadsheet.batch_update({'requests': [{'addSheet': {'properties': {
+                    'title': df_var_name,
+                    'gridProperties': {'rowCount': len(rows) + 10, 'columnCount': len(headers) + 5}
+                }}}]})
+                create_tab = False
+                tab_created = True
+                values = [headers] + rows
+            if not appended:
+                response = spreadsheet.values_append(
+                    f"'{df_var_name}'!A1",
+                    params={'valueInputOption': 'RAW', 'insertDataOption': 'INSERT_ROWS'},
+                    body={'values': values}
+                )
+                appended = True
+                updated_range = response.get('updates', {}).get('updatedRange', '')
+                first_row = re.search(r'![A-Z]+(\d+)', updated_range)
+                # The tab existed but was empty, so the header still has to go on top
+                header_missing = not tab_created and bool(first_row) and first_row.group(1) == '1'
+            if header_missing:
+                spreadsheet.worksheet(df_var_name).insert_row(headers, 1, value_input_option='RAW')
+                header_missing = False
+            remember_pushed_tdates(df, df_var_name)
             print(f"✅ Data from {df_var_name} written to Google Sheets.")
             return
-        except WorksheetNotFound:
-            try:
-                worksheet = spreadsheet.add_worksheet(title=df_var_name, rows=str(len(rows)+10), cols=str(len(headers)+5))
-                worksheet.append_row(headers)
-                if rows:
-                    worksheet.append_rows(rows)
-                print(f"✅ Data from {df_var_name} written to Google Sheets.")
-                return
-            except APIError as e:
-                if '500' in str(e):
-                    print(f"⚠ Attempt {attempt + 1}/{retries} failed: Google Sheets APIError [500]. Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                else:
-                    raise
         except APIError as e:
-            if '500' in str(e):
-                print(f"⚠ Attempt {attempt + 1}/{retries} failed: Google Sheets APIError [500]. Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
+            if (not create_tab and not tab_created and not appended
+                    and e.response.status_code == 400 and 'Unable to parse range' in str(e)):
+                # Missing tab: create it, then append header and rows together
+                create_tab = True
+                continue  # Discovering the missing tab does not use up an attempt
+            wait = get_retry_delay(e, attempt, base_delay)
+            if wait is None:
                 raise
-    print(f"❌ Failed to write {df_var_name} to Google Sheets after {retries} attempts.")
+            print(f"⚠ Attempt {attempt + 1}/{retries} failed: Google Sheets APIError [{e.response.status_code}].")
+            if attempt == retries - 1:
+                print(f"❌ Failed to write {df_var_name} to Google Sheets after {retries} attempts.")
+                raise
+            print(f"Retrying in {wait:.1f} seconds...")
+            time.sleep(wait)
+            attempt += 1
 
 def sheet_has_today(spreadsheet, df_var_name, today_str):
     """
     Check if the worksheet for df_var_name has TDATE == today_str in any row.
+    Only the TDATE column is downloaded, not the whole sheet, and only on the first check for a tab;
+    later checks are answered from _tdate_cache.
     Returns True if today's date is found, False otherwise.
     """
+    if df_var_name in _tdate_cache:
+        return today_str in _tdate_cache[df_var_name]
     try:
         worksheet = spreadsheet.worksheet(df_var_name)
-        all_values = worksheet.get_all_values()
-        if not all_values or "TDATE" not in all_values[0]:
-            return False
-        tdate_idx = all_values[0].index("TDATE")
-        for row in all_values[1:]:
-            if len(row) > tdate_idx and row[tdate_idx] == today_str:
-                return True
-        return False
+        # TDATE is written as the first column, so column A is usually all that is needed
+        tdate_values = worksheet.col_values(1)
+        if tdate_values and tdate_values[0] != "TDATE":
+            headers = worksheet.row_values(1)
+            tdate_values = worksheet.col_values(headers.index("TDATE") + 1) if "TDATE" in headers else []
+        _tdate_cache[df_var_name] = set(tdate_values[1:])
     except WorksheetNotFound:
-        return False
+        _tdate_cache[df_var_name] = set()
+    return today_str in _tdate_cache[df_var_name]
 
 # ---------------------- Data Fetching Logic ----------------------
+def is_wr_row(row, config):
+    """
+    Apply the endpoint's Western Railway zone filter to a single API row.
+    A row is kept only if its zone (dstnzone or srczone for OD data) is 'WR'; rows missing the field are dropped.
+    """
+    if config.table_name == 'fois_od_data':
+        # For fois_od_data, keep rows where dstnzone == 'WR' or srczone == 'WR'
+        return row.get('dstnzone') == 'WR' or row.get('srczone') == 'WR'
+    return row.get('zone') == 'WR'
+
+def stream_wr_rows(response, config):
+    """
+    Stream-parse the JSON array in a streamed response and keep only rows passing the zone filter,
+    so peak memory follows the filtered rows rather than the full response.
+    """
+    response.raw.decode_content = True  # Let urllib3 undo gzip/deflate while streaming
+    return [
+        row for row in ijson.items(response.raw, 'item', use_float=True)
+        if isinstance(row, dict) and is_wr_row(row, config)
+    ]
+
+def process_response(data, df_var_name, date_str, spreadsheet):
+    """
+    Add TDATE to the zone-filtered API rows and push them to Google Sheets.
+    Returns the filtered rows.
+    """
+    if not data:
+        print(f"\n{df_var_name} =")
+        print("No data found for zone 'WR'")
+        return data
+    df = pd.DataFrame(data)
+    df.insert(0, "TDATE", date_str)
+    print(f"\n{df_var_name} =")
+    print(df)
+    with _GSHEET_LOCK:
+        push_df_to_gsheet(df, df_var_name, spreadsheet)
+    return data
+
+def retry_on_401(func):
+    """
+    Decorator for FOIS requests taking the client as first argument:
+    if the gateway rejects the token with 401, refresh it once and re-run the request.
+    """
+    @functools.wraps(func)
+    def wrapper(client, *args, **kwargs):
+        try:
+            return func(client, *args, **kwargs)
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 401:
+                raise
+            print("Access token rejected (401), requesting a new one and retrying...")
+            client.force_refresh_token()
+            return func(client, *args, **kwargs)
+    return wrapper
+
+@retry_on_401
+def get_wr_rows(client, config, params):
+    """
+    Call a FOIS endpoint and return its zone-filtered rows.
+    """
+    token = client.ensure_valid_token()
+    headers = {"Authorization": f"Bearer {token}"}  # accept is already set on the session
+    response = client.session.get(config.url, params=params, headers=headers, stream=True)
+    response.raise_for_status()
+    # Zone filter is applied while parsing, before any DataFrame is built
+    with response:
+        return stream_wr_rows(response, config)
+
 def fetch_fois_data(client, config, spreadsheet):
     """
     Fetch data from Indian Railway FOIS API, apply zone filter, and push to Google Sheets.
     Only fetch and append if today's date is not already present in the sheet.
     """
-    df_var_name = f"df_{config['table_name']}"
-    date_str = (datetime.now() - timedelta(days=config['date_config']['deltadays'])).strftime(config['date_config']['formatter'])
+    df_var_name = f"df_{config.table_name}"
+    date_str = (datetime.now() - timedelta(days=config.deltadays)).strftime(config.formatter)
     print(f"Using date {date_str} for {df_var_name} API call")
     # Skip if today's data already present in Google Sheet
-    if sheet_has_today(spreadsheet, df_var_name, date_str):
+    with _GSHEET_LOCK:
+        present = sheet_has_today(spreadsheet, df_var_name, date_str)
+    if present:
         print(f"⏩ Skipping {df_var_name}: TDATE {date_str} already present.")
         return None
+    params = {"date": date_str}
     try:
-        token = client.ensure_valid_token()
-        params = {"date": date_str}
-        headers = config['headers'].copy()
-        headers["Authorization"] = headers["Authorization"].replace("@token", token)
-        response = requests.get(config['url'], params=params, headers=headers)
-        response.raise_for_status()
-        try:
-            data = response.json()
-            if isinstance(data, list) and data and isinstance(data[0], dict):
-                df = pd.DataFrame(data)
-                # Apply appropriate zone filter based on endpoint
-                zone_column = 'dstnzone' if config['table_name'] == 'fois_od_data' else 'zone'
-                if zone_column in df.columns:
-                    if config['table_name'] == 'fois_od_data':
-                        # For fois_od_data, filter where dstnzone == 'WR' or srczone == 'WR'
-                        df = df[(df['dstnzone'] == 'WR') | (df['srczone'] == 'WR')]
-                    else:
-                        df = df[df[zone_column] == 'WR']
-                    if df.empty:
-                        print(f"\n{df_var_name} =")
-                        print(f"No data found for {zone_column}='WR'")
-                        return data
-                df.insert(0, "TDATE", date_str)
-                globals()[df_var_name] = df
-                print(f"\n{df_var_name} =")
-                print(df)
-                push_df_to_gsheet(df, df_var_name, spreadsheet)
-            return data
-        except json.JSONDecodeError:
-            print("Response is not valid JSON. Raw response:")
-            print(response.text)
-            return response.text
+        data = get_wr_rows(client, config, params)
+        return process_response(data, df_var_name, date_str, spreadsheet)
+    except ijson.JSONError as e:
+        # The streamed body is already consumed, so it cannot be re-read with response.json()
+        print(f"Response is not valid JSON: {e}")
+        return None
     except requests.exceptions.RequestException as e:
         print(f"Error making request for {df_var_name}: {e}")
         if hasattr(e, 'response') and e.response is not None:
             print(f"Status code: {e.response.status_code}")
             print(f"Response text: {e.response.text}")
-            if e.response.status_code == 401:
-                client.access_token = None
-                client.token_expires_at = None
-                try:
-                    token = client.ensure_valid_token()
-                    headers["Authorization"] = f"Bearer {token}"
-                    response = requests.get(config['url'], params=params, headers=headers)
-                    response.raise_for_status()
-                    data = response.json()
-                    if isinstance(data, list) and data and isinstance(data[0], dict):
-                        df = pd.DataFrame(data)
-                        # Apply appropriate zone filter based on endpoint
-                        zone_column = 'dstnzone' if config['table_name'] == 'fois_od_data' else 'zone'
-                        if zone_column in df.columns:
-                            if config['table_name'] == 'fois_od_data':
-                                df = df[(df['dstnzone'] == 'WR') | (df['srczone'] == 'WR')]
-                            else:
-                                df = df[df[zone_column] == 'WR']
-                            if df.empty:
-                                print(f"\n{df_var_name} =")
-                                print(f"No data found for {zone_column}='WR'")
-                                return data
-                        df.insert(0, "TDATE", date_str)
-                        globals()[df_var_name] = df
-                        print(f"\n{df_var_name} =")
-                        print(df)
-                        push_df_to_gsheet(df, df_var_name, spreadsheet)
-                    return data
-                except Exception as retry_error:
-                    print(f"Retry failed for {df_var_name}: {retry_error}")
         return None
 
 # ---------------------- Utility Functions ----------------------
+@dataclass(frozen=True)
+class EndpointConfig:
+    """
+    Static configuration for one FOIS endpoint.
+    """
+    url: str
+    table_name: str
+    formatter: str = "%d-%m-%Y"
+    deltadays: int = 1
+
+API_CONFIGS = (
+    EndpointConfig(
+        url="https://gw.crisapis.indianrail.gov.in/t/fois.cris.in/foisrlydashb/1.0/pndgindt",
+        table_name="fois_indent_data"
+    ),
+    EndpointConfig(
+        url="https://gw.crisapis.indianrail.gov.in/t/fois.cris.in/foisrlydashb/1.0/plctresndttn",
+        table_name="fois_detn_data"
+    ),
+    EndpointConfig(
+        url="https://gw.crisapis.indianrail.gov.in/t/fois.cris.in/foisrlydashb/1.0/wghtleadntkmfrgt",
+        table_name="fois_od_data"
+    )
+)
+
 def get_api_configs():
     """
     Return list of API configurations for FOIS endpoints.
     """
-    return [
-        {
-            "url": "https://gw.crisapis.indianrail.gov.in/t/fois.cris.in/foisrlydashb/1.0/pndgindt",
-            "method": "GET",
-            "date_config": {"formatter": "%d-%m-%Y", "deltadays": 1},
-            "headers": {"accept": "*/*", "Authorization": "Bearer @token"},
-            "parameters": {"date": "@toDate"},
-            "table_name": "fois_indent_data"
-        },
-        {
-            "url": "https://gw.crisapis.indianrail.gov.in/t/fois.cris.in/foisrlydashb/1.0/plctresndttn",
-            "method": "GET",
-            "date_config": {"formatter": "%d-%m-%Y", "deltadays": 1},
-            "headers": {"accept": "*/*", "Authorization": "Bearer @token"},
-            "parameters": {"date": "@toDate"},
-            "table_name": "fois_detn_data"
-        },
-        {
-            "url": "https://gw.crisapis.indianrail.gov.in/t/fois.cris.in/foisrlydashb/1.0/wghtleadntkmfrgt",
-            "method": "GET",
-            "date_config": {"formatter": "%d-%m-%Y", "deltadays": 1},  # Changed to fetch yesterday's data
-            "headers": {"accept": "*/*", "Authorization": "Bearer @token"},
-            "parameters": {"date": "@fromDate"},
-            "table_name": "fois_od_data"
-        }
-    ]
+    return list(API_CONFIGS)
 
 def parse_arguments():
     """
@@ -307,6 +450,8 @@ def parse_arguments():
     parser.add_argument('--endpoint', 
                         help='Endpoint to fetch data for (pndgindt, plctresndttn, wghtleadntkmfrgt) or index (1-3)',
                         required=False)
+    parser.add_argument('--logout', action='store_true',
+                        help='Revoke the access token (and drop the cached copy) after the run')
     return parser.parse_args()
 
 # ---------------------- Main Execution ----------------------
@@ -330,7 +475,7 @@ def main():
                     print(f"Error: Endpoint index {idx} is out of range (1-{len(api_configs)})")
                     sys.exit(1)
             else:
-                api_configs_to_run = [config for config in api_configs if config['url'].endswith(endpoint_arg)]
+                api_configs_to_run = [config for config in api_configs if config.url.endswith(endpoint_arg)]
                 if not api_configs_to_run:
                     print(f"Error: Endpoint '{endpoint_arg}' is not valid.")
                     sys.exit(1)
@@ -341,18 +486,33 @@ def main():
         gclient = get_gspread_client()
         spreadsheet = get_spreadsheet(gclient)
 
-        # Fetch and push data for each endpoint
-        for config in api_configs_to_run:
-            endpoint_name = config['url'].split('/')[-1]
-            print(f"\nFetching data for endpoint: {endpoint_name}")
-            date_str = (datetime.now() - timedelta(days=config['date_config']['deltadays'])).strftime(config['date_config']['formatter'])
-            print(f"Date: {date_str}")
-            success = fetch_fois_data(client, config, spreadsheet)
-            if success is None:
-                print(f"Failed to fetch data for {endpoint_name}")
-            time.sleep(1)  # Delay to avoid hitting Google Sheets API rate limits
-
-        client.revoke_token()
+        # Obtain the token up front so the workers share it
+        client.ensure_valid_token()
+
+        # Fetch and push data for all endpoints concurrently; the FOIS requests overlap
+        failed_endpoints = []
+        with ThreadPoolExecutor(max_workers=len(api_configs_to_run)) as executor:
+            futures = {
+                executor.submit(fetch_fois_data, client, config, spreadsheet): config
+                for config in api_configs_to_run
+            }
+            for future in as_completed(futures):
+                endpoint_name = futures[future].url.split('/')[-1]
+                try:
+                    if future.result() is None:
+                        print(f"Failed to fetch data for {endpoint_name}")
+                except Exception as e:
+                    print(f"Exception while fetching data for {endpoint_name}: {e}")
+                    failed_endpoints.append(endpoint_name)
+
+        # The token is cached for later runs, so only revoke it when asked to
+        if args.logout:
+            client.revoke_token()
+        client.session.close()
+        if failed_endpoints:
+            # Exit non-zero so a scheduled run that lost a day's data gets noticed
+            print(f"❌ Failed endpoints: {', '.join(failed_endpoints)}")
+            sys.exit(1)
         sys.exit(0)
     except ValueError as e:
         print(f"Configuration Error: {e}")
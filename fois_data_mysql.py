@@ -1,15 +1,25 @@
 import requests
 import json
+import orjson
+import ijson
 import os
 import base64
+import hashlib
 import argparse
 import sys
 import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import pandas as pd
+import pyarrow as pa
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, PoolError
+from mysql.connector.pooling import MySQLConnectionPool
 
 # ---------------------- FOIS API Client ----------------------
 class FOISAPIClient:
@@ -26,6 +36,59 @@ class FOISAPIClient:
         self.revoke_url = "https://gw.crisapis.indianrail.gov.in/revoke"
         self.access_token = None
         self.token_expires_at = None
+        self.auth_header = None
+        self.token_lock = threading.Lock()
+        # Reuse one keep-alive session for the token, revoke and data endpoints
+        self.session = requests.Session()
+        self.session.headers.update({"accept": "*/*"})
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504])
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries))
+        self.token_cache_file = os.path.expanduser(os.getenv('FOIS_TOKEN_CACHE', '~/.fois_token.json'))
+        self.load_cached_token()
+
+    def load_cached_token(self):
+        """
+        Load a previously cached access token if it is still valid for at least another minute.
+        """
+        try:
+            with open(self.token_cache_file) as f:
+                cached = json.load(f)
+            expires_at = datetime.fromisoformat(cached['expires_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if expires_at > datetime.now() + timedelta(seconds=60):
+            self.access_token = cached['access_token']
+            self.token_expires_at = expires_at
+            self.auth_header = f"Bearer {self.access_token}"
+            print(f"✓ Using cached access token (valid until {expires_at:%H:%M:%S})")
+
+    def save_cached_token(self):
+        """
+        Atomically write the current access token and its expiry to the token cache file.
+        """
+        tmp_file = None
+        try:
+            # A temp file of our own (mkstemp creates it with mode 0600), so scripts running at the
+            # same time never write into each other's file before the rename
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.token_cache_file) or '.', suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"access_token": self.access_token, "expires_at": self.token_expires_at.isoformat()}, f)
+            os.replace(tmp_file, self.token_cache_file)
+        except OSError as e:
+            print(f"Warning: could not cache access token: {e}")
+            if tmp_file is not None and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+
+    def clear_cached_token(self):
+        """
+        Remove the token cache file, if any.
+        """
+        try:
+            os.remove(self.token_cache_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: could not remove cached access token: {e}")
 
     def get_access_token(self):
         """
@@ -40,15 +103,18 @@ class FOISAPIClient:
         data = {"grant_type": "client_credentials"}
         try:
             print("Requesting access token...")
-            response = requests.post(self.token_url, headers=headers, data=data)
+            response = self.session.post(self.token_url, headers=headers, data=data)
             response.raise_for_status()
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             self.access_token = token_data.get('access_token')
             expires_in = token_data.get('expires_in', 3600)
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)
+            # Treat the token as expired a little early so it never lapses mid-request
+            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - max(60, 0.05 * expires_in))
+            self.auth_header = f"Bearer {self.access_token}"
             print(f"✓ Access token obtained successfully (expires in {expires_in} seconds)")
+            self.save_cached_token()
             return self.access_token
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
             print(f"Error getting access token: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 print(f"Status code: {e.response.status_code}")
@@ -66,10 +132,12 @@ class FOISAPIClient:
     def ensure_valid_token(self):
         """
         Ensure a valid access token is available.
+        Guarded by a lock so concurrent endpoint fetches refresh the token only once.
         """
-        if not self.is_token_valid():
-            self.get_access_token()
-        return self.access_token
+        with self.token_lock:
+            if not self.is_token_valid():
+                self.get_access_token()
+            return self.access_token
 
     def revoke_token(self):
         """
@@ -87,10 +155,12 @@ class FOISAPIClient:
         data = {"token": self.access_token}
         try:
             print("Revoking access token...")
-            response = requests.post(self.revoke_url, headers=headers, data=data)
+            response = self.session.post(self.revoke_url, headers=headers, data=data)
             response.raise_for_status()
             self.access_token = None
             self.token_expires_at = None
+            self.auth_header = None
+            self.clear_cached_token()
             print("✓ Token revoked successfully")
         except requests.exceptions.RequestException as e:
             print(f"Error revoking token: {e}")
@@ -99,34 +169,75 @@ class FOISAPIClient:
                 print(f"Response: {e.response.text}")
 
 # ---------------------- MySQL Helpers ----------------------
+def get_mysql_config():
+    """
+    Return MySQL connection settings from .env.
+    """
+    return {
+        "host": os.getenv('MYSQL_HOST'),
+        "user": os.getenv('MYSQL_USER'),
+        "password": os.getenv('MYSQL_PASSWORD'),
+        "database": os.getenv('MYSQL_DATABASE'),
+        "use_pure": False,  # Prefer the C extension for faster protocol handling
+        "allow_local_infile": True  # Needed for LOAD DATA LOCAL INFILE bulk loads
+    }
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+def get_mysql_pool():
+    """
+    Return the process-wide MySQL connection pool, creating it on first use.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = MySQLConnectionPool(pool_name="fois", pool_size=4, autocommit=False, **get_mysql_config())
+            print(f"Connected to MySQL database: {os.getenv('MYSQL_DATABASE')}")
+        return _POOL
+
 def get_mysql_connection():
     """
-    Create and return a MySQL database connection using credentials from .env.
+    Return a MySQL connection from the shared pool. Closing it hands it back to the pool.
+    The pool does not wait for a free connection, so when all are in use a direct connection is opened.
+    Connection errors are raised to the caller, as the dashboard imports this module.
     """
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('MYSQL_HOST'),
-            user=os.getenv('MYSQL_USER'),
-            password=os.getenv('MYSQL_PASSWORD'),
-            database=os.getenv('MYSQL_DATABASE')
-        )
-        if connection.is_connected():
-            print(f"Connected to MySQL database: {os.getenv('MYSQL_DATABASE')}")
-            return connection
+        return get_mysql_pool().get_connection()
+    except PoolError:
+        return mysql.connector.connect(autocommit=False, **get_mysql_config())
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
-        sys.exit(1)
+        raise
+
+def validate_table_name(table_name):
+    """
+    Reject table names outside the FOIS endpoint tables before they are interpolated into SQL.
+    """
+    if table_name not in ALLOWED_TABLES:
+        raise ValueError(f"Unknown table name: {table_name!r}")
+
+# Tables already known to exist, so repeat checks skip the database round-trip
+_KNOWN_TABLES = set()
 
 def table_exists(connection, table_name):
     """
     Check if a table exists in the database.
     """
+    validate_table_name(table_name)
+    if table_name in _KNOWN_TABLES:
+        return True
     cursor = None
     try:
         cursor = connection.cursor()
-        cursor.execute(f"SHOW TABLES LIKE '{table_name}'")
+        cursor.execute(
+            "SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s LIMIT 1",
+            (table_name,)
+        )
         result = cursor.fetchone()
         print(f"Table {table_name} exists: {result is not None}")
+        if result is not None:
+            _KNOWN_TABLES.add(table_name)
         return result is not None
     except Error as e:
         print(f"Error checking table existence for {table_name}: {e}")
@@ -137,10 +248,12 @@ def table_exists(connection, table_name):
 
 def infer_mysql_type(dtype, column_name):
     """
-    Map pandas dtype to MySQL data type, with special handling for TDATE.
+    Map pandas dtype to MySQL data type, with special handling for TDATE and row_hash.
     """
     if column_name == 'TDATE':
         return 'DATE'
+    if column_name == 'row_hash':
+        return 'CHAR(32)'
     dtype = str(dtype).lower()
     if 'int' in dtype:
         return 'BIGINT'
@@ -157,6 +270,7 @@ def create_table_if_not_exists(connection, table_name, df):
     """
     Create a table if it doesn't exist, using DataFrame columns and inferred types.
     """
+    validate_table_name(table_name)
     try:
         cursor = connection.cursor()
         columns = df.columns.tolist()
@@ -164,6 +278,12 @@ def create_table_if_not_exists(connection, table_name, df):
         for col in columns:
             mysql_type = infer_mysql_type(df[col].dtype, col)
             mysql_types.append(f"`{col}` {mysql_type}")
+        if 'TDATE' in columns:
+            # Index TDATE so the per-date existence checks are index seeks
+            mysql_types.append("INDEX `idx_tdate` (`TDATE`)")
+            if 'row_hash' in columns:
+                # Natural key so re-inserted rows are dropped by INSERT IGNORE
+                mysql_types.append("UNIQUE KEY `uk_natural` (`TDATE`, `row_hash`)")
         columns_sql = ", ".join(mysql_types)
         # Add an auto-incrementing ID as primary key to avoid issues with composite keys
         create_table_sql = f"""
@@ -175,26 +295,67 @@ def create_table_if_not_exists(connection, table_name, df):
         print(f"Executing table creation SQL for {table_name}:\n{create_table_sql}")
         cursor.execute(create_table_sql)
         connection.commit()
+        _KNOWN_TABLES.add(table_name)
+        if 'row_hash' in columns:
+            _KEYED_TABLES.add(table_name)
         print(f"Table {table_name} checked/created successfully.")
         cursor.close()
     except Error as e:
         print(f"Error creating table {table_name}: {e}")
         raise
 
+# Tables whose TDATE index and natural key are known to be in place
+_KEYED_TABLES = set()
+
+def ensure_table_keys(connection, table_name):
+    """
+    Add the TDATE index and the (TDATE, row_hash) natural key to a table created before
+    they were part of the table definition. Existing rows keep a NULL row_hash.
+    """
+    validate_table_name(table_name)
+    if table_name in _KEYED_TABLES:
+        return
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME IN ('idx_tdate', 'uk_natural')",
+            (table_name,)
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        alterations = []
+        if 'idx_tdate' not in existing:
+            alterations.append("ADD INDEX `idx_tdate` (`TDATE`)")
+        if 'uk_natural' not in existing:
+            alterations.append("ADD COLUMN `row_hash` CHAR(32) NULL")
+            alterations.append("ADD UNIQUE KEY `uk_natural` (`TDATE`, `row_hash`)")
+        if alterations:
+            print(f"Adding missing keys to {table_name}...")
+            cursor.execute(f"ALTER TABLE `{table_name}` {', '.join(alterations)}")
+        _KEYED_TABLES.add(table_name)
+    except Error as e:
+        print(f"Error adding keys to {table_name}: {e}")
+        raise
+    finally:
+        if cursor is not None:
+            cursor.close()
+
 def data_exists_for_date(connection, table_name, date_str):
     """
     Check if data for the given date exists in the table.
     """
+    validate_table_name(table_name)
     cursor = None
     try:
         cursor = connection.cursor()
         # Convert date_str to YYYY-MM-DD for MySQL query
         api_date = datetime.strptime(date_str, '%d-%m-%Y').strftime('%Y-%m-%d')
-        query = f"SELECT COUNT(*) FROM `{table_name}` WHERE TDATE = %s"
+        query = f"SELECT EXISTS(SELECT 1 FROM `{table_name}` WHERE TDATE = %s LIMIT 1)"
         cursor.execute(query, (api_date,))
-        count = cursor.fetchone()[0]
-        print(f"Data for {api_date} in {table_name}: {'exists' if count > 0 else 'does not exist'}")
-        return count > 0
+        present = bool(cursor.fetchone()[0])
+        print(f"Data for {api_date} in {table_name}: {'exists' if present else 'does not exist'}")
+        return present
     except Error as e:
         print(f"Error checking existing data in {table_name}: {e}")
         return False
@@ -202,35 +363,133 @@ def data_exists_for_date(connection, table_name, date_str):
         if cursor is not None:
             cursor.close()
 
-def insert_data_to_mysql(df, table_name, connection, retries=3, delay=5):
+def data_exists_for_dates(connection, table_dates):
+    """
+    Check several tables for data on their dates in a single UNION ALL query.
+    table_dates maps table name to date_str; returns a dict of table name to bool.
+    """
+    for table_name in table_dates:
+        validate_table_name(table_name)
+    cursor = None
+    try:
+        cursor = connection.cursor()
+        selects = []
+        params = []
+        for table_name, date_str in table_dates.items():
+            api_date = datetime.strptime(date_str, '%d-%m-%Y').strftime('%Y-%m-%d')
+            selects.append(f"SELECT %s, EXISTS(SELECT 1 FROM `{table_name}` WHERE TDATE = %s LIMIT 1)")
+            params.extend([table_name, api_date])
+        cursor.execute(" UNION ALL ".join(selects), params)
+        already_present = {table_name: bool(present) for table_name, present in cursor.fetchall()}
+        for table_name, present in already_present.items():
+            print(f"Data for {table_dates[table_name]} in {table_name}: {'exists' if present else 'does not exist'}")
+        return already_present
+    except Error as e:
+        # A missing table fails the whole batch (e.g. on first run), so check tables one by one
+        print(f"Batched data check failed ({e}), checking tables individually.")
+        return {table_name: data_exists_for_date(connection, table_name, date_str)
+                for table_name, date_str in table_dates.items()}
+    finally:
+        if cursor is not None:
+            cursor.close()
+
+def load_data_local_infile(cursor, table_name, df, columns_sql):
+    """
+    Bulk load DataFrame rows into the table with a single LOAD DATA LOCAL INFILE command.
+    The connector only uploads files from a client-side path, so rows are staged in a temporary CSV.
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, newline='', encoding='utf-8') as csv_file:
+        df.to_csv(csv_file, index=False, header=False, lineterminator='\n')
+    try:
+        load_sql = (
+            f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE `{table_name}` CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({columns_sql})"
+        )
+        cursor.execute(load_sql, (csv_file.name,))
+    finally:
+        os.remove(csv_file.name)
+
+def insert_rows_in_chunks(connection, table_name, columns_sql, rows, chunksize):
+    """
+    Insert rows as multi-row INSERT IGNORE statements of up to chunksize rows each.
+    Full chunks reuse one server-side prepared statement, so the SQL is parsed once and
+    values travel in the binary protocol; the remainder goes through a plain executemany.
+    """
+    if not rows:
+        return
+    # A prepared statement is limited to 65535 placeholders
+    chunksize = max(1, min(chunksize, 65535 // len(rows[0])))
+    row_placeholder = f"({', '.join(['%s'] * len(rows[0]))})"
+    full_rows = len(rows) - len(rows) % chunksize
+    if full_rows:
+        prepared_sql = f"INSERT IGNORE INTO `{table_name}` ({columns_sql}) VALUES {', '.join([row_placeholder] * chunksize)}"
+        cursor = connection.cursor(prepared=True)
+        try:
+            for start in range(0, full_rows, chunksize):
+                cursor.execute(prepared_sql, [value for row in rows[start:start + chunksize] for value in row])
+        finally:
+            cursor.close()
+    if full_rows < len(rows):
+        # executemany rewrites the remainder into a single multi-row INSERT
+        insert_sql = f"INSERT IGNORE INTO `{table_name}` ({columns_sql}) VALUES {row_placeholder}"
+        cursor = connection.cursor()
+        try:
+            cursor.executemany(insert_sql, rows[full_rows:])
+        finally:
+            cursor.close()
+
+def compute_row_hashes(df):
     """
-    Insert DataFrame data into the MySQL table with retries.
+    Hash each row's values; with TDATE the hash forms the natural key used by INSERT IGNORE.
+    Identical rows within one batch are numbered before hashing, so genuine repeats in a day's
+    payload are all kept while reloading the same payload still inserts nothing new.
     """
+    seen = {}
+    hashes = []
+    for values in df.itertuples(index=False, name=None):
+        key = "\x1f".join(str(v) for v in values)
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        hashes.append(hashlib.md5(f"{key}\x1e{occurrence}".encode()).hexdigest())
+    return hashes
+
+def insert_data_to_mysql(df, table_name, connection, retries=3, delay=5, chunksize=1000):
+    """
+    Insert DataFrame data into the MySQL table with retries, skipping rows already stored.
+    Rows are bulk loaded with LOAD DATA LOCAL INFILE; if the server does not allow
+    local infile, they are sent as multi-row INSERT statements of up to chunksize rows each.
+    """
+    validate_table_name(table_name)
     # Convert TDATE to YYYY-MM-DD format for MySQL DATE type
     if 'TDATE' in df.columns:
-        df['TDATE'] = pd.to_datetime(df['TDATE'], format='%d-%m-%Y').dt.strftime('%Y-%m-%d')
-        df['TDATE'] = pd.to_datetime(df['TDATE'], format='%Y-%m-%d').dt.date
-    # Convert all other columns to string for consistency, except TDATE
-    for col in df.columns:
-        if col != 'TDATE':
-            df[col] = df[col].astype(str)
+        df['TDATE'] = pd.to_datetime(df['TDATE'], format='%d-%m-%Y').dt.date
+    # Convert all other columns to string for consistency, except TDATE.
+    # build_dataframe already formats values as text; any null left becomes 'None' the same way
+    other_cols = df.columns.difference(['TDATE'])
+    df[other_cols] = df[other_cols].astype(object).where(df[other_cols].notna(), 'None').astype(str)
+    if 'TDATE' in df.columns:
+        df['row_hash'] = compute_row_hashes(df[other_cols])
     columns = df.columns.tolist()
-    placeholders = ', '.join(['%s'] * len(columns))
     columns_sql = ', '.join([f"`{col}`" for col in columns])
-    insert_sql = f"INSERT INTO `{table_name}` ({columns_sql}) VALUES ({placeholders})"
-    
+
+    # Ensure table exists before inserting; it cannot disappear between retries
+    if not table_exists(connection, table_name):
+        print(f"Table {table_name} does not exist, creating it...")
+        create_table_if_not_exists(connection, table_name, df)
+    elif 'TDATE' in df.columns:
+        ensure_table_keys(connection, table_name)
+
     for attempt in range(retries):
         cursor = None
         try:
             cursor = connection.cursor()
-            # Ensure table exists before inserting
-            if not table_exists(connection, table_name):
-                print(f"Table {table_name} does not exist, creating it...")
-                create_table_if_not_exists(connection, table_name, df)
-            else:
-                print(f"Table {table_name} already exists, proceeding with insert.")
-            for _, row in df.iterrows():
-                cursor.execute(insert_sql, tuple(row))
+            try:
+                load_data_local_infile(cursor, table_name, df, columns_sql)
+            except Error as e:
+                print(f"LOAD DATA LOCAL INFILE not available for {table_name} ({e}), falling back to multi-row INSERT.")
+                rows = list(df.itertuples(index=False, name=None))
+                insert_rows_in_chunks(connection, table_name, columns_sql, rows, chunksize)
             connection.commit()
             print(f"✅ Data from {table_name} inserted into MySQL ({len(df)} rows).")
             # Only close cursor here after successful insert
@@ -252,89 +511,123 @@ def insert_data_to_mysql(df, table_name, connection, retries=3, delay=5):
                     pass
 
 # ---------------------- Data Fetching Logic ----------------------
-def fetch_fois_data(client, config, connection):
+def is_wr_row(row, config):
+    """
+    Apply the endpoint's Western Railway zone filter to a single API row.
+    A row is kept only if its zone (dstnzone or srczone for OD data) is 'WR'; rows missing the field are dropped.
+    """
+    if config['table_name'] == 'fois_od_data':
+        return row.get('dstnzone') == 'WR' or row.get('srczone') == 'WR'
+    return row.get('zone') == 'WR'
+
+def stream_wr_rows(response, config):
+    """
+    Stream-parse the JSON array in a streamed response and keep only rows passing the zone filter,
+    so peak memory follows the filtered rows rather than the full response.
+    """
+    response.raw.decode_content = True  # Let urllib3 undo gzip/deflate while streaming
+    return [
+        row for row in ijson.items(response.raw, 'item', use_float=True)
+        if isinstance(row, dict) and is_wr_row(row, config)
+    ]
+
+def build_dataframe(data):
+    """
+    Build a pyarrow-backed DataFrame of string columns from the API's list of dicts.
+    Each value is formatted from the parsed JSON with str(), nulls and missing fields as 'None',
+    so the stored text does not depend on the dtype pandas or Arrow would infer for that day's rows.
+    """
+    columns = dict.fromkeys(key for row in data for key in row)
+    table = pa.table({col: pa.array([str(row.get(col)) for row in data], type=pa.string()) for col in columns})
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def get_date_str(config):
+    """
+    Return the API date string for an endpoint config.
+    """
+    return (datetime.now() - timedelta(days=config['date_config']['deltadays'])).strftime(config['date_config']['formatter'])
+
+def fetch_fois_data(client, config, connection, already_present=None):
     """
     Fetch data from Indian Railway FOIS API, apply zone filter, and store in MySQL.
     Only fetch and insert if today's date is not already present in the table.
+    already_present optionally maps table names to a pre-computed (batched) date check.
     """
     table_name = f"df_{config['table_name']}"
-    date_str = (datetime.now() - timedelta(days=config['date_config']['deltadays'])).strftime(config['date_config']['formatter'])
+    date_str = get_date_str(config)
     print(f"Using date {date_str} for {table_name} API call")
     # Skip if today's data already present in MySQL table
-    if data_exists_for_date(connection, table_name, date_str):
+    if already_present is not None and table_name in already_present:
+        present = already_present[table_name]
+    else:
+        present = data_exists_for_date(connection, table_name, date_str)
+    if present:
         print(f"⏩ Skipping {table_name}: TDATE {date_str} already present.")
         return None
+    params = {"date": date_str}
     try:
-        token = client.ensure_valid_token()
-        params = {"date": date_str}
-        headers = config['headers'].copy()
-        headers["Authorization"] = headers["Authorization"].replace("@token", token)
-        response = requests.get(config['url'], params=params, headers=headers)
+        client.ensure_valid_token()
+        headers = {**config['headers'], "Authorization": client.auth_header}
+        response = client.session.get(config['url'], params=params, headers=headers, stream=True)
         response.raise_for_status()
         try:
-            data = response.json()
-            if isinstance(data, list) and data and isinstance(data[0], dict):
-                df = pd.DataFrame(data)
-                # Apply appropriate zone filter based on endpoint
-                zone_column = 'dstnzone' if config['table_name'] == 'fois_od_data' else 'zone'
-                if zone_column in df.columns:
-                    if config['table_name'] == 'fois_od_data':
-                        df = df[(df['dstnzone'] == 'WR') | (df['srczone'] == 'WR')]
-                    else:
-                        df = df[df[zone_column] == 'WR']
-                    if df.empty:
-                        print(f"\n{table_name} =")
-                        print(f"No data found for {zone_column}='WR'")
-                        return data
-                df.insert(0, "TDATE", date_str)
-                globals()[table_name] = df
+            # Zone filter is applied while parsing, before any DataFrame is built
+            with response:
+                data = stream_wr_rows(response, config)
+            if not data:
                 print(f"\n{table_name} =")
-                print(df)
-                insert_data_to_mysql(df, table_name, connection)
+                print("No data found for zone 'WR'")
+                return data
+            df = build_dataframe(data)
+            df.insert(0, "TDATE", date_str)
+            print(f"\n{table_name} =")
+            print(df)
+            insert_data_to_mysql(df, table_name, connection)
             return data
-        except json.JSONDecodeError:
-            print("Response is not valid JSON. Raw response:")
-            print(response.text)
-            return response.text
+        except ijson.JSONError as e:
+            print(f"Response is not valid JSON: {e}")
+            return None
     except requests.exceptions.RequestException as e:
         print(f"Error making request for {table_name}: {e}")
         if hasattr(e, 'response') and e.response is not None:
             print(f"Status code: {e.response.status_code}")
             print(f"Response text: {e.response.text}")
             if e.response.status_code == 401:
-                client.access_token = None
-                client.token_expires_at = None
                 try:
-                    # Ensure params and headers are defined in this scope
-                    token = client.ensure_valid_token()
-                    params = {"date": date_str}
-                    headers = config['headers'].copy()
-                    headers["Authorization"] = f"Bearer {token}"
-                    response = requests.get(config['url'], params=params, headers=headers)
+                    # Refresh the token and retry with the rebuilt header; the lock keeps
+                    # concurrent workers from requesting and caching tokens at the same time
+                    with client.token_lock:
+                        client.get_access_token()
+                    headers = {**config['headers'], "Authorization": client.auth_header}
+                    response = client.session.get(config['url'], params=params, headers=headers, stream=True)
                     response.raise_for_status()
-                    data = response.json()
-                    if isinstance(data, list) and data and isinstance(data[0], dict):
-                        df = pd.DataFrame(data)
-                        zone_column = 'dstnzone' if config['table_name'] == 'fois_od_data' else 'zone'
-                        if zone_column in df.columns:
-                            if config['table_name'] == 'fois_od_data':
-                                df = df[(df['dstnzone'] == 'WR') | (df['srczone'] == 'WR')]
-                            else:
-                                df = df[df[zone_column] == 'WR']
-                            if df.empty:
-                                print(f"\n{table_name} =")
-                                print(f"No data found for {zone_column}='WR'")
-                                return data
-                        df.insert(0, "TDATE", date_str)
-                        globals()[table_name] = df
+                    with response:
+                        data = stream_wr_rows(response, config)
+                    if not data:
                         print(f"\n{table_name} =")
-                        print(df)
-                        insert_data_to_mysql(df, table_name, connection)
+                        print("No data found for zone 'WR'")
+                        return data
+                    df = build_dataframe(data)
+                    df.insert(0, "TDATE", date_str)
+                    print(f"\n{table_name} =")
+                    print(df)
+                    insert_data_to_mysql(df, table_name, connection)
                     return data
                 except Exception as retry_error:
                     print(f"Retry failed for {table_name}: {retry_error}")
         return None
 
+def fetch_with_pooled_connection(client, config, already_present=None):
+    """
+    Fetch one endpoint on a connection of its own from the pool, since MySQL connections are not thread-safe.
+    """
+    print(f"\nFetching data for endpoint: {config['url'].split('/')[-1]}")
+    connection = get_mysql_connection()
+    try:
+        return fetch_fois_data(client, config, connection, already_present)
+    finally:
+        connection.close()
+
 # ---------------------- Utility Functions ----------------------
 def get_api_configs():
     """
@@ -367,6 +660,9 @@ def get_api_configs():
         }
     ]
 
+# Only these tables may be interpolated into SQL statements
+ALLOWED_TABLES = {f"df_{config['table_name']}" for config in get_api_configs()}
+
 def parse_arguments():
     """
     Parse command line arguments to select specific API endpoint.
@@ -375,6 +671,8 @@ def parse_arguments():
     parser.add_argument('--endpoint', 
                         help='Endpoint to fetch data for (pndgindt, plctresndttn, wghtleadntkmfrgt) or index (1-3)',
                         required=False)
+    parser.add_argument('--logout', action='store_true',
+                        help='Revoke the access token (and drop the cached copy) after the run')
     return parser.parse_args()
 
 # ---------------------- Main Execution ----------------------
@@ -382,7 +680,6 @@ def main():
     """
     Main function to execute the FOIS API calls and store data in MySQL.
     """
-    connection = None  # Ensure connection is defined for finally block
     try:
         args = parse_arguments()
         client = FOISAPIClient()
@@ -410,27 +707,37 @@ def main():
         else:
             api_configs_to_run = api_configs
 
-        # Setup MySQL connection
+        # Check all target tables for their dates in one round-trip
         connection = get_mysql_connection()
-
-        # Fetch and store data for each endpoint
-        for config in api_configs_to_run:
-            endpoint_name = config['url'].split('/')[-1]
-            print(f"\nFetching data for endpoint: {endpoint_name}")
-            date_str = (datetime.now() - timedelta(days=config['date_config']['deltadays'])).strftime(config['date_config']['formatter'])
-            print(f"Date: {date_str}")
-            try:
-                success = fetch_fois_data(client, config, connection)
-                if success is None:
-                    print(f"Failed to fetch data for {endpoint_name}")
-            except Exception as e:
-                print(f"Exception while fetching data for {endpoint_name}: {e}")
-            time.sleep(1)  # Delay to avoid rate limits
-
-        client.revoke_token()
-        if connection is not None and hasattr(connection, "is_connected") and connection.is_connected():
+        try:
+            already_present = data_exists_for_dates(
+                connection,
+                {f"df_{config['table_name']}": get_date_str(config) for config in api_configs_to_run}
+            )
+        finally:
             connection.close()
-            print("MySQL connection closed.")
+
+        # Obtain the token up front so the workers share it
+        client.ensure_valid_token()
+
+        # Fetch and store data for all endpoints concurrently
+        with ThreadPoolExecutor(max_workers=len(api_configs_to_run)) as executor:
+            futures = {
+                executor.submit(fetch_with_pooled_connection, client, config, already_present): config
+                for config in api_configs_to_run
+            }
+            for future in as_completed(futures):
+                endpoint_name = futures[future]['url'].split('/')[-1]
+                try:
+                    success = future.result()
+                    if success is None:
+                        print(f"Failed to fetch data for {endpoint_name}")
+                except Exception as e:
+                    print(f"Exception while fetching data for {endpoint_name}: {e}")
+
+        # The token is cached for later runs, so only revoke it when asked to
+        if args.logout:
+            client.revoke_token()
         sys.exit(0)
     except ValueError as e:
         print(f"Configuration Error: {e}")
@@ -450,10 +757,6 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
-    finally:
-        if connection is not None and hasattr(connection, "is_connected") and connection.is_connected():
-            connection.close()
-            print("MySQL connection closed.")
 
 def run_for_table(table_key):
     """
@@ -481,7 +784,6 @@ def run_for_table(table_key):
         for config in configs_to_run:
             print(f"Running fetch for {config['table_name']}")
             fetch_fois_data(client, config, connection)
-        client.revoke_token()
         if connection and hasattr(connection, 'is_connected') and connection.is_connected():
             connection.close()
         return True